@@ -5,13 +5,63 @@ This is a Python alternative to the bash script with better error handling
 """
 
 import os
+import re
 import sys
 import time
 import json
+import random
+import hashlib
+import socket
+import subprocess
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Directory holding this script, its config and the deployment scripts
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# How long a detected public IP is reused before asking ipify again (seconds)
+PUBLIC_IP_CACHE_TTL = 3600
+
+# Concurrent API requests during the pre-flight lookups; the connection pool
+# keeps this many sockets open so every later call reuses a warm connection
+API_MAX_CONNECTIONS = 3
+
+# (connect, read) timeout for Hetzner API requests (seconds)
+API_TIMEOUT = (5, 30)
+
+# How often a rate-limited (429) POST is retried after honoring Retry-After
+POST_RATE_LIMIT_RETRIES = 3
+
+# Upper bound on a single Retry-After wait (seconds)
+RETRY_AFTER_MAX = 60
+
+# [export] KEY=value lines in hetzner-config.env (which bash also sources).
+# Only the simple forms are accepted: no spaces around '=', and a value that is
+# a single double-quoted, single-quoted or quote-free word. A '#' only starts
+# a comment after whitespace, so TOKEN=abc#def keeps the '#'. Anything else,
+# e.g. KEY = 1 or KEY="a"b, is reported as unparseable rather than guessed at
+CONFIG_LINE_RE = re.compile(
+    r'^[ \t]*(?:export[ \t]+)?([A-Z_][A-Z0-9_]*)='
+    r'(?:"([^"\n]*)"|\'([^\'\n]*)\'|([^"\'\s]+))?(?:[ \t]+#.*)?[ \t]*$'
+)
+
+# Environment variables that override hetzner-config.env. CLOUDFLARE_* and
+# DOMAIN_NAME are left out: 03-setup-ssl.sh reads those from the file under
+# sudo, which would not see the overrides
+CONFIG_ENV_OVERRIDES = (
+    'HETZNER_API_TOKEN',
+    'SERVER_NAME',
+    'SERVER_TYPE',
+    'SERVER_LOCATION',
+    'SERVER_IMAGE',
+    'SSH_KEY_NAME',
+    'ENABLE_FIREWALL',
+    'ENABLE_BACKUPS',
+)
+
 # Colors for terminal output
 class Colors:
     RED = '\033[0;31m'
@@ -20,10 +70,17 @@ class Colors:
     BLUE = '\033[0;34m'
     NC = '\033[0m'  # No Color
 
+# Drop ANSI escapes when output is redirected or NO_COLOR is set
+if not sys.stdout.isatty() or os.environ.get('NO_COLOR') is not None:
+    Colors.RED = Colors.GREEN = Colors.YELLOW = Colors.BLUE = Colors.NC = ''
+
 def load_config():
-    """Load configuration from hetzner-config.env file"""
-    script_dir = Path(__file__).parent
-    config_file = script_dir / "hetzner-config.env"
+    """Load configuration from hetzner-config.env file
+    
+    Matching environment variables override the file, so secrets such as
+    HETZNER_API_TOKEN can be injected (e.g. in CI) instead of stored in it.
+    """
+    config_file = SCRIPT_DIR / "hetzner-config.env"
     
     if not config_file.exists():
         print(f"{Colors.RED}ERROR: Configuration file not found!{Colors.NC}")
@@ -31,24 +88,24 @@ def load_config():
         sys.exit(1)
     
     config = {}
-    with open(config_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                # Remove quotes
-                value = value.strip().strip('"').strip("'")
-                config[key] = value
+    for lineno, line in enumerate(config_file.read_text().splitlines(), 1):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        m = CONFIG_LINE_RE.match(line)
+        if not m:
+            print(f"{Colors.YELLOW}Warning: Ignoring unparseable line {lineno} in {config_file.name}: {line.strip()}{Colors.NC}")
+            continue
+        config[m.group(1)] = next((g for g in m.groups()[1:] if g is not None), '')
+    config.update((k, os.environ[k]) for k in CONFIG_ENV_OVERRIDES if k in os.environ)
     
     return config
 
-def validate_config(config):
+def validate_config(config, required=('HETZNER_API_TOKEN',)):
     """Validate required configuration values"""
-    required = ['HETZNER_API_TOKEN']
     for key in required:
         if key not in config or not config[key] or config[key] == 'your-api-token-here':
             print(f"{Colors.RED}ERROR: {key} not set!{Colors.NC}")
-            print(f"Please set it in hetzner-config.env")
+            print(f"Please set it in hetzner-config.env or the environment")
             sys.exit(1)
     
     # Set defaults
@@ -69,21 +126,40 @@ class HetznerAPI:
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json"
         }
-    
-    def _request(self, method, endpoint, data=None):
+        # Reuse one connection for all API calls instead of a new TLS handshake per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Retry transient errors on idempotent requests only; a retried POST
+        # could create a second server
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["GET", "PUT", "DELETE"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=API_MAX_CONNECTIONS, max_retries=retry))
+    
+    def _request(self, method, endpoint, data=None, params=None):
         """Make API request"""
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers)
-            else:
+            if method not in ('GET', 'POST', 'PUT', 'DELETE'):
                 raise ValueError(f"Unsupported method: {method}")
             
+            response = self.session.request(method, url, params=params, json=data, timeout=API_TIMEOUT)
+            # A 429 means the POST was rejected, so it is safe to resend
+            if method == 'POST':
+                for _ in range(POST_RATE_LIMIT_RETRIES):
+                    if response.status_code != 429:
+                        break
+                    # Retry-After may also be an HTTP-date; fall back to 1s then
+                    retry_after = response.headers.get("Retry-After", "").strip()
+                    time.sleep(min(int(retry_after) if retry_after.isdigit() else 1, RETRY_AFTER_MAX))
+                    response = self.session.request(method, url, json=data, timeout=API_TIMEOUT)
+            
             response.raise_for_status()
             
             # Handle 204 No Content (empty response)
@@ -93,70 +169,154 @@ class HetznerAPI:
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"{Colors.RED}API Error: {e}{Colors.NC}")
-            if hasattr(e.response, 'text'):
+            if getattr(e, 'response', None) is not None:
                 print(f"Response: {e.response.text}")
             sys.exit(1)
     
-    def get(self, endpoint):
-        return self._request('GET', endpoint)
+    def get(self, endpoint, params=None):
+        return self._request('GET', endpoint, params=params)
     
     def post(self, endpoint, data):
         return self._request('POST', endpoint, data)
     
+    def put(self, endpoint, data):
+        return self._request('PUT', endpoint, data)
+    
     def delete(self, endpoint):
         return self._request('DELETE', endpoint)
 
+def find_by_name(resources, name):
+    """Return the first resource called name, or None"""
+    return next((resource for resource in resources if resource['name'] == name), None)
+
 def get_ssh_key_id(api, ssh_key_name):
     """Get SSH key ID by name"""
-    response = api.get("ssh_keys")
+    # Let the API filter by name so we don't download every key
+    response = api.get("ssh_keys", params={"name": ssh_key_name})
     
-    for key in response['ssh_keys']:
-        if key['name'] == ssh_key_name:
-            return key['id']
+    key = find_by_name(response['ssh_keys'], ssh_key_name)
+    if key:
+        return key['id']
     
     print(f"{Colors.RED}ERROR: SSH key '{ssh_key_name}' not found!{Colors.NC}")
     print("\nAvailable SSH keys:")
-    for key in response['ssh_keys']:
-        print(f"  - {key['name']} (ID: {key['id']})")
+    available = {key['name']: key['id'] for key in api.get("ssh_keys")['ssh_keys']}
+    for name, key_id in sorted(available.items()):
+        print(f"  - {name} (ID: {key_id})")
     print("\nPlease create an SSH key in Hetzner Console or update SSH_KEY_NAME in config")
     sys.exit(1)
 
 def check_existing_server(api, server_name):
     """Check if server already exists"""
-    response = api.get("servers")
-    
-    for server in response['servers']:
-        if server['name'] == server_name:
-            return server['id']
-    
-    return None
+    response = api.get("servers", params={"name": server_name})
+    server = find_by_name(response['servers'], server_name)
+    
+    return server['id'] if server else None
+
+def preflight_lookups(api, config, firewall_name=None):
+    """Run the independent SSH key, server and firewall lookups concurrently
+    
+    Returns (ssh_key_id, existing_server_id, existing_firewalls); the
+    firewall list is None when firewall_name is not given.
+    """
+    with ThreadPoolExecutor(max_workers=API_MAX_CONNECTIONS) as pool:
+        ssh_key_future = pool.submit(get_ssh_key_id, api, config['SSH_KEY_NAME'])
+        server_future = pool.submit(check_existing_server, api, config['SERVER_NAME'])
+        firewalls_future = None
+        if firewall_name:
+            firewalls_future = pool.submit(api.get, "firewalls", {"name": firewall_name})
+        
+        return (
+            ssh_key_future.result(),
+            server_future.result(),
+            firewalls_future.result()['firewalls'] if firewalls_future else None
+        )
 
 def get_public_ip():
-    """Get the public IP address of the local machine"""
+    """Get the public IP address of the local machine (cached for an hour)
+    
+    Returns None if it can't be detected.
+    """
+    cache_file = Path.home() / ".cache/stx-deploy/public-ip.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < PUBLIC_IP_CACHE_TTL:
+            return json.loads(cache_file.read_text())['ip']
+    except (OSError, ValueError, KeyError):
+        pass
+    
     try:
         response = requests.get('https://api.ipify.org?format=json', timeout=5)
-        return response.json()['ip']
+        ip = response.json()['ip']
     except:
-        print(f"{Colors.YELLOW}Warning: Could not detect public IP, SSH will allow from anywhere{Colors.NC}")
         return None
+    
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"ip": ip, "ts": time.time()}))
+    except OSError:
+        pass
+    
+    return ip
+
+# Firewall rules that don't depend on the deployment machine; the SSH rule
+# is added by create_firewall
+FIREWALL_RULES = (
+    # Inbound rules
+    {
+        "direction": "in",
+        "protocol": "tcp",
+        "port": "443",
+        "source_ips": ["0.0.0.0/0", "::/0"],
+        "description": "HTTPS"
+    },
+    # Outbound rules
+    {
+        "direction": "out",
+        "protocol": "tcp",
+        "port": "80",
+        "destination_ips": ["0.0.0.0/0", "::/0"],
+        "description": "HTTP outbound"
+    },
+    {
+        "direction": "out",
+        "protocol": "tcp",
+        "port": "443",
+        "destination_ips": ["0.0.0.0/0", "::/0"],
+        "description": "HTTPS outbound"
+    },
+    {
+        "direction": "out",
+        "protocol": "tcp",
+        "port": "20443",
+        "destination_ips": ["0.0.0.0/0", "::/0"],
+        "description": "Stacks API"
+    },
+    {
+        "direction": "out",
+        "protocol": "tcp",
+        "port": "20444",
+        "destination_ips": ["0.0.0.0/0", "::/0"],
+        "description": "Stacks P2P"
+    }
+)
 
-def create_firewall(api, firewall_name):
-    """Create firewall with restrictive rules"""
+def create_firewall(api, firewall_name, existing=None):
+    """Create firewall with restrictive rules
+    
+    existing: optional prefetched result of the firewalls-by-name lookup
+    """
     # Check if firewall already exists
-    response = api.get("firewalls")
-    for firewall in response['firewalls']:
-        if firewall['name'] == firewall_name:
-            print(f"Firewall already exists (ID: {firewall['id']})")
-            return firewall['id']
+    if existing is None:
+        existing = api.get("firewalls", params={"name": firewall_name})['firewalls']
+    firewall = find_by_name(existing, firewall_name)
+    if firewall:
+        print(f"Firewall already exists (ID: {firewall['id']})")
     
     # Get public IP for SSH restriction
     public_ip = get_public_ip()
     ssh_source_ips = [f"{public_ip}/32"] if public_ip else ["0.0.0.0/0", "::/0"]
     
-    if public_ip:
-        print(f"Restricting SSH access to: {public_ip}")
-    
-    # Create new firewall with restrictive rules
+    # Restrictive firewall rules
     firewall_data = {
         "name": firewall_name,
         "rules": [
@@ -168,45 +328,33 @@ def create_firewall(api, firewall_name):
                 "source_ips": ssh_source_ips,
                 "description": "SSH (restricted to deployment machine)"
             },
-            {
-                "direction": "in",
-                "protocol": "tcp",
-                "port": "443",
-                "source_ips": ["0.0.0.0/0", "::/0"],
-                "description": "HTTPS"
-            },
-            # Outbound rules
-            {
-                "direction": "out",
-                "protocol": "tcp",
-                "port": "80",
-                "destination_ips": ["0.0.0.0/0", "::/0"],
-                "description": "HTTP outbound"
-            },
-            {
-                "direction": "out",
-                "protocol": "tcp",
-                "port": "443",
-                "destination_ips": ["0.0.0.0/0", "::/0"],
-                "description": "HTTPS outbound"
-            },
-            {
-                "direction": "out",
-                "protocol": "tcp",
-                "port": "20443",
-                "destination_ips": ["0.0.0.0/0", "::/0"],
-                "description": "Stacks API"
-            },
-            {
-                "direction": "out",
-                "protocol": "tcp",
-                "port": "20444",
-                "destination_ips": ["0.0.0.0/0", "::/0"],
-                "description": "Stacks P2P"
-            }
+            *FIREWALL_RULES
         ]
     }
     
+    # Tag the firewall with a hash of its rules so re-runs can detect drift
+    rules_hash = hashlib.sha256(json.dumps(firewall_data['rules'], sort_keys=True).encode()).hexdigest()[:16]
+    firewall_data['labels'] = {"rules-hash": rules_hash}
+    
+    if firewall:
+        if firewall['labels'].get('rules-hash') != rules_hash:
+            # Without our IP the SSH rule would fall back to 0.0.0.0/0; never
+            # widen an existing firewall on that basis
+            if not public_ip:
+                print(f"{Colors.YELLOW}Warning: Public IP unknown, leaving existing firewall rules unchanged{Colors.NC}")
+                return firewall['id']
+            print("Firewall rules changed, updating...")
+            print(f"Restricting SSH access to: {public_ip}")
+            api.post(f"firewalls/{firewall['id']}/actions/set_rules", {"rules": firewall_data['rules']})
+            api.put(f"firewalls/{firewall['id']}", {"labels": {**firewall['labels'], "rules-hash": rules_hash}})
+            print(f"{Colors.GREEN}✓ Firewall rules updated{Colors.NC}")
+        return firewall['id']
+    
+    if public_ip:
+        print(f"Restricting SSH access to: {public_ip}")
+    else:
+        print(f"{Colors.YELLOW}Warning: Could not detect public IP, SSH will allow from anywhere{Colors.NC}")
+    
     response = api.post("firewalls", firewall_data)
     firewall_id = response['firewall']['id']
     print(f"{Colors.GREEN}✓ Firewall created (ID: {firewall_id}){Colors.NC}")
@@ -242,46 +390,67 @@ def create_server(api, config, ssh_key_id, firewall_id=None):
     
     return response
 
-def wait_for_server(api, server_id):
-    """Wait for server to be ready"""
-    print("\nWaiting for server to be ready...")
-    print("(This may take 1-2 minutes)")
-    
-    for i in range(60):
-        response = api.get(f"servers/{server_id}")
-        status = response['server']['status']
+def backoff_delays(initial, maximum, factor=1.3):
+    """Yield exponentially growing sleep intervals, capped at maximum"""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * factor, maximum)
+
+def wait_for_action(api, action_id, timeout=180):
+    """Wait for an API action (e.g. create_server) to finish"""
+    # Exponential backoff: poll often early (fast provisions), back off later
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays(0.5, 10.0):
+        action = api.get(f"actions/{action_id}")['action']
         
-        if status == 'running':
-            print(f"\n{Colors.GREEN}✓ Server is running!{Colors.NC}")
-            return response['server']
+        if action['status'] == 'success':
+            return action
+        
+        if action['status'] == 'error':
+            print(f"\n{Colors.RED}ERROR: Action '{action['command']}' failed: {action['error']['message']}{Colors.NC}")
+            sys.exit(1)
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
         
         print(".", end='', flush=True)
-        time.sleep(2)
+        time.sleep(min(delay + random.uniform(0, 0.2), remaining))
     
-    print(f"\n{Colors.RED}Timeout waiting for server{Colors.NC}")
+    print(f"\n{Colors.RED}Timeout waiting for action {action_id}{Colors.NC}")
     sys.exit(1)
 
-def save_server_info(config, server, root_password, firewall_id):
-    """Save server information to file"""
-    script_dir = Path(__file__).parent
-    info_file = script_dir / "server-info.txt"
+def wait_for_server(api, response):
+    """Wait for the actions started by server creation, then fetch the server"""
+    print("\nWaiting for server to be ready...")
+    print("(This may take 1-2 minutes)")
     
-    ipv4 = server['public_net']['ipv4']['ip']
-    ipv6 = server['public_net'].get('ipv6', {}).get('ip', 'N/A')
-    ssh_key_name = config.get('SSH_KEY_NAME', 'admin')
+    # next_actions holds the start_server action when start_after_create is set
+    for action in [response['action']] + response.get('next_actions', []):
+        wait_for_action(api, action['id'])
+    
+    print(f"\n{Colors.GREEN}✓ Server is running!{Colors.NC}")
     
-    info = f"""==========================================
+    # The POST response already carries the assigned IPs; only re-fetch if it didn't
+    post_server = response['server']
+    if (post_server['public_net'].get('ipv4') or {}).get('ip'):
+        return {**post_server, 'status': 'running'}
+    return api.get(f"servers/{post_server['id']}")['server']
+
+# Static text of server-info.txt; filled in by save_server_info
+SERVER_INFO_TEMPLATE = """==========================================
 STX Node Map Server Information
 ==========================================
-Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Created: {created}
 
 Server Details:
-  Name:       {server['name']}
-  ID:         {server['id']}
-  Type:       {config['SERVER_TYPE']}
-  Location:   {config['SERVER_LOCATION']}
-  Image:      {config['SERVER_IMAGE']}
-  Status:     {server['status']}
+  Name:       {name}
+  ID:         {id}
+  Type:       {server_type}
+  Location:   {location}
+  Image:      {image}
+  Status:     {status}
 
 Network:
   IPv4:       {ipv4}
@@ -291,8 +460,8 @@ Access:
   Initial SSH: ssh root@{ipv4}
   Admin SSH:   ssh {ssh_key_name}@{ipv4} (after step 2)
 
-{f"Root Password: {root_password}" if root_password else "Root Password: (using SSH key)"}
-{f"Firewall ID: {firewall_id}" if firewall_id else "Firewall: disabled"}
+{root_password_line}
+{firewall_line}
 
 ==========================================
 Next Steps:
@@ -349,7 +518,7 @@ IMPORTANT: Before starting, ensure configuration files are ready:
      sudo systemctl restart stx-node-map-discoverer
 
 5. Configure DNS (point your domain to server IP):
-   A record: {config.get('DOMAIN_NAME', 'your-domain.com')} → {ipv4}
+   A record: {domain_name} → {ipv4}
    
    Wait 5-30 minutes for DNS propagation.
 
@@ -366,14 +535,103 @@ IMPORTANT: Before starting, ensure configuration files are ready:
    - Set up auto-renewal
 
 ==========================================
-Access your site at: https://{config.get('DOMAIN_NAME', 'your-domain.com')}
+Access your site at: https://{domain_name}
 ==========================================
 """
+
+def save_server_info(config, server, root_password, firewall_id):
+    """Save server information to server-info.txt (and server-info.json for scripts)"""
+    info_file = SCRIPT_DIR / "server-info.txt"
+    
+    ipv4 = server['public_net']['ipv4']['ip']
+    ipv6 = server['public_net'].get('ipv6', {}).get('ip', 'N/A')
+    ssh_key_name = config.get('SSH_KEY_NAME', 'admin')
+    
+    fields = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'name': server['name'],
+        'id': server['id'],
+        'server_type': config['SERVER_TYPE'],
+        'location': config['SERVER_LOCATION'],
+        'image': config['SERVER_IMAGE'],
+        'status': server['status'],
+        'ipv4': ipv4,
+        'ipv6': ipv6,
+        'ssh_key_name': ssh_key_name,
+        'root_password': root_password,
+        'firewall_id': firewall_id,
+        'domain_name': config.get('DOMAIN_NAME', 'your-domain.com'),
+    }
     
-    with open(info_file, 'w') as f:
-        f.write(info)
+    info = SERVER_INFO_TEMPLATE.format_map({
+        **fields,
+        'root_password_line': f"Root Password: {root_password}" if root_password else "Root Password: (using SSH key)",
+        'firewall_line': f"Firewall ID: {firewall_id}" if firewall_id else "Firewall: disabled",
+    })
     
-    return info_file, ipv4
+    info_file.write_text(info)
+    # Machine-readable copy so automation doesn't have to parse the text above
+    info_file.with_suffix('.json').write_text(json.dumps(fields, indent=2) + "\n")
+    
+    return info_file, ipv4, info
+
+def wait_for_ssh(ipv4, timeout=60):
+    """Wait until sshd on the server answers with its protocol banner"""
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays(0.5, 5.0):
+        try:
+            # An open port alone can precede sshd being ready; wait for "SSH-"
+            with socket.create_connection((ipv4, 22), timeout=2) as conn:
+                if conn.recv(4).startswith(b'SSH-'):
+                    return True
+        except OSError:
+            pass
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+
+def copy_deployment_files(script_dir, ipv4):
+    """Stream the deployment directory to /tmp/deployment over a single SSH connection"""
+    # One tar stream instead of scp -r's per-file round-trips
+    tar = subprocess.Popen(
+        ["tar", "-C", str(script_dir.parent), "-cf", "-", script_dir.name],
+        stdout=subprocess.PIPE
+    )
+    ssh = subprocess.run(
+        ["ssh", "-C", "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=10", f"root@{ipv4}",
+         "mkdir -p /tmp/deployment && tar -xf - -C /tmp/deployment --strip-components=1"],
+        stdin=tar.stdout
+    )
+    tar.stdout.close()
+    return tar.wait() == 0 and ssh.returncode == 0
+
+def confirm(question):
+    """Ask a yes/no question"""
+    return input(f"{question} (yes/no): ").lower() in ['yes', 'y']
+
+def has_cloudflare_token(config):
+    """Check whether Cloudflare DNS automation is configured"""
+    cloudflare_token = config.get('CLOUDFLARE_API_TOKEN', '')
+    return bool(cloudflare_token) and cloudflare_token != 'your_cloudflare_api_token_here'
+
+def prompts(config, existing_server_id):
+    """Ask every yes/no question up front so the API work runs uninterrupted"""
+    answers = {"delete_existing": False, "copy_files": False, "run_ssl": False}
+    
+    print()
+    if existing_server_id:
+        print(f"{Colors.YELLOW}WARNING: Server '{config['SERVER_NAME']}' already exists (ID: {existing_server_id}){Colors.NC}")
+        answers["delete_existing"] = confirm("Do you want to delete it and create a new one?")
+        if not answers["delete_existing"]:
+            return answers
+    
+    answers["copy_files"] = confirm("Copy deployment files to the server once it is ready?")
+    if has_cloudflare_token(config):
+        answers["run_ssl"] = confirm("Setup SSL and update Cloudflare DNS once the server is ready?")
+    
+    return answers
 
 def clean_resources(config, api):
     """Delete server and firewall"""
@@ -383,49 +641,51 @@ def clean_resources(config, api):
     print(f"{Colors.YELLOW}Cleaning up resources for '{server_name}'...{Colors.NC}")
     print()
     
-    # Delete server
-    print("Step 1: Finding and deleting server...")
-    response = api.get("servers")
-    server_id = None
-    
-    for server in response['servers']:
-        if server['name'] == server_name:
-            server_id = server['id']
-            break
+    # Both lookups are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        server_future = pool.submit(check_existing_server, api, server_name)
+        firewalls_future = pool.submit(api.get, "firewalls", {"name": firewall_name})
+        server_id = server_future.result()
+        firewalls = firewalls_future.result()['firewalls']
     
+    # Collect both confirmations before deleting anything
+    print("Step 1: Finding server...")
+    delete_server = False
     if server_id:
         print(f"  Found server (ID: {server_id})")
-        response = input("  Delete this server? (yes/no): ")
-        if response.lower() in ['yes', 'y']:
-            api.delete(f"servers/{server_id}")
-            print(f"  {Colors.GREEN}✓ Server deleted{Colors.NC}")
-            time.sleep(2)
-        else:
-            print("  Skipped server deletion")
+        delete_server = confirm("  Delete this server?")
     else:
         print(f"  No server named '{server_name}' found")
     
-    # Delete firewall
     print()
-    print("Step 2: Finding and deleting firewall...")
-    response = api.get("firewalls")
-    firewall_id = None
+    print("Step 2: Finding firewall...")
+    firewall = find_by_name(firewalls, firewall_name)
+    firewall_id = firewall['id'] if firewall else None
+    delete_firewall = False
+    if firewall_id:
+        print(f"  Found firewall (ID: {firewall_id})")
+        delete_firewall = confirm("  Delete this firewall?")
+    else:
+        print(f"  No firewall named '{firewall_name}' found")
     
-    for firewall in response['firewalls']:
-        if firewall['name'] == firewall_name:
-            firewall_id = firewall['id']
-            break
+    print()
+    print("Step 3: Deleting resources...")
+    if server_id:
+        if delete_server:
+            action = api.delete(f"servers/{server_id}")['action']
+            # The firewall can only be deleted once the server has released it
+            wait_for_action(api, action['id'])
+            print()
+            print(f"  {Colors.GREEN}✓ Server deleted{Colors.NC}")
+        else:
+            print("  Skipped server deletion")
     
     if firewall_id:
-        print(f"  Found firewall (ID: {firewall_id})")
-        response = input("  Delete this firewall? (yes/no): ")
-        if response.lower() in ['yes', 'y']:
+        if delete_firewall:
             api.delete(f"firewalls/{firewall_id}")
             print(f"  {Colors.GREEN}✓ Firewall deleted{Colors.NC}")
         else:
             print("  Skipped firewall deletion")
-    else:
-        print(f"  No firewall named '{firewall_name}' found")
     
     print()
     print(f"{Colors.GREEN}✓ Cleanup complete!{Colors.NC}")
@@ -460,7 +720,8 @@ def main():
     
     # Load and validate configuration
     config = load_config()
-    validate_config(config)
+    # Creating a server also needs the SSH key; clean does not
+    validate_config(config, required=('HETZNER_API_TOKEN', 'SSH_KEY_NAME'))
     
     print("Configuration:")
     print(f"  Server Name: {config['SERVER_NAME']}")
@@ -475,33 +736,36 @@ def main():
     # Initialize API client
     api = HetznerAPI(config['HETZNER_API_TOKEN'])
     
-    # Step 1: Check SSH key
+    enable_firewall = config['ENABLE_FIREWALL'].lower() == 'true'
+    firewall_name = f"{config['SERVER_NAME']}-firewall"
+    
+    # Step 1: Check SSH key (the step 2 and 3 lookups run alongside it)
     print("Step 1: Checking SSH key...")
-    ssh_key_id = get_ssh_key_id(api, config['SSH_KEY_NAME'])
+    ssh_key_id, existing_server_id, existing_firewalls = preflight_lookups(
+        api, config, firewall_name if enable_firewall else None
+    )
     print(f"{Colors.GREEN}✓ SSH key found (ID: {ssh_key_id}){Colors.NC}")
     
     # Step 2: Check existing server
     print("\nStep 2: Checking if server already exists...")
-    existing_server_id = check_existing_server(api, config['SERVER_NAME'])
+    
+    # Ask everything now; from here on the run needs no operator input
+    answers = prompts(config, existing_server_id)
     
     if existing_server_id:
-        print(f"{Colors.YELLOW}WARNING: Server '{config['SERVER_NAME']}' already exists (ID: {existing_server_id}){Colors.NC}")
-        response = input("Do you want to delete it and create a new one? (yes/no): ")
-        if response.lower() in ['yes', 'y']:
-            print("Deleting existing server...")
-            api.delete(f"servers/{existing_server_id}")
-            print("Waiting for server deletion...")
-            time.sleep(5)
-        else:
+        if not answers["delete_existing"]:
             print("Aborting.")
             sys.exit(0)
+        print("\nDeleting existing server...")
+        action = api.delete(f"servers/{existing_server_id}")['action']
+        print("Waiting for server deletion...")
+        wait_for_action(api, action['id'])
     
     # Step 3: Create firewall
     firewall_id = None
-    if config['ENABLE_FIREWALL'].lower() == 'true':
+    if enable_firewall:
         print("\nStep 3: Creating firewall...")
-        firewall_name = f"{config['SERVER_NAME']}-firewall"
-        firewall_id = create_firewall(api, firewall_name)
+        firewall_id = create_firewall(api, firewall_name, existing=existing_firewalls)
     else:
         print("\nStep 3: Skipping firewall creation...")
     
@@ -515,10 +779,10 @@ def main():
     print(f"{Colors.GREEN}✓ Server creation initiated (ID: {server_id}){Colors.NC}")
     
     # Step 5: Wait for server
-    server = wait_for_server(api, server_id)
+    server = wait_for_server(api, response)
     
     # Save server info
-    info_file, ipv4 = save_server_info(config, server, root_password, firewall_id)
+    info_file, ipv4, info = save_server_info(config, server, root_password, firewall_id)
     
     print()
     print("=" * 50)
@@ -526,44 +790,48 @@ def main():
     print("=" * 50)
     print()
     
-    with open(info_file) as f:
-        print(f.read())
+    print(info)
     
     print(f"{Colors.YELLOW}Server information saved to: {info_file}{Colors.NC}")
     print()
     
-    # Offer to copy deployment files
-    response = input("Would you like to copy deployment files to the server now? (yes/no): ")
-    if response.lower() in ['yes', 'y']:
-        print("\nWaiting 10 seconds for SSH to be ready...")
-        time.sleep(10)
+    # Copy deployment files
+    if answers["copy_files"]:
+        print("\nWaiting for SSH to be ready...")
+        if not wait_for_ssh(ipv4):
+            print(f"{Colors.YELLOW}Warning: SSH port not reachable yet, trying anyway{Colors.NC}")
         
         print("Copying deployment files...")
-        script_dir = Path(__file__).parent
-        os.system(f"scp -o StrictHostKeyChecking=no -r {script_dir} root@{ipv4}:/tmp/deployment")
-        
-        print()
-        print(f"{Colors.GREEN}Deployment files copied!{Colors.NC}")
+        if copy_deployment_files(SCRIPT_DIR, ipv4):
+            print()
+            print(f"{Colors.GREEN}Deployment files copied!{Colors.NC}")
+        else:
+            print()
+            print(f"{Colors.RED}ERROR: Copying deployment files failed{Colors.NC}")
     
-    # Offer to setup SSL with Cloudflare
+    # Setup SSL with Cloudflare
     print()
-    cloudflare_token = config.get('CLOUDFLARE_API_TOKEN', '')
-    if cloudflare_token and cloudflare_token != 'your_cloudflare_api_token_here':
-        response = input("Would you like to setup SSL and update Cloudflare DNS now? (yes/no): ")
-        if response.lower() in ['yes', 'y']:
+    if has_cloudflare_token(config):
+        if answers["run_ssl"]:
             print()
             print("Running SSL setup with Cloudflare DNS automation...")
-            script_dir = Path(__file__).parent
-            ssl_script = script_dir / "03-setup-ssl.sh"
-            os.system(f"sudo {ssl_script} {ipv4}")
+            ssl_script = SCRIPT_DIR / "03-setup-ssl.sh"
+            # The script prompts (e.g. to renew an existing cert), so it keeps
+            # the terminal; its output streams directly
+            proc = subprocess.run(["sudo", str(ssl_script), ipv4])
             
             print()
-            print(f"{Colors.GREEN}✓ SSL and DNS configured!{Colors.NC}")
-            print()
-            print("You can now access your server at:")
-            domain_name = config.get('DOMAIN_NAME', '')
-            if domain_name and domain_name != 'your-domain.com':
-                print(f"  https://{domain_name}")
+            if proc.returncode == 0:
+                print(f"{Colors.GREEN}✓ SSL and DNS configured!{Colors.NC}")
+                print()
+                print("You can now access your server at:")
+                domain_name = config.get('DOMAIN_NAME', '')
+                if domain_name and domain_name != 'your-domain.com':
+                    print(f"  https://{domain_name}")
+            else:
+                print(f"{Colors.RED}ERROR: SSL setup failed (exit code {proc.returncode}){Colors.NC}")
+                print("To retry later:")
+                print(f"  sudo ./03-setup-ssl.sh {ipv4}")
     else:
         print(f"{Colors.YELLOW}Note: CLOUDFLARE_API_TOKEN not configured{Colors.NC}")
         print("To setup SSL later with Cloudflare automation:")